@@ -1,26 +1,129 @@
 #!/usr/bin/env python3
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from collections import defaultdict
-import texttable as tt  # A simple library to draw text tables
-import argparse
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import lru_cache
+from pathlib import Path
+from sortedcontainers import SortedDict, SortedList  # Keep events ordered by start time
+from types import SimpleNamespace
+import io
+import os
 import sys
 import json
 
 
-# Dictionary to store events
-events = {}
+class EventStore(MutableMapping):
+    """Events keyed by start time, kept sorted, with an index of start times per category."""
+
+    def __init__(self):
+        self._events = SortedDict()
+        self._by_category = defaultdict(SortedList)
+        self._durations = SortedList()  # Bounds how far back a still-running event can start
+
+    def __getitem__(self, start_time):
+        return self._events[start_time]
+
+    def __setitem__(self, start_time, event):
+        if start_time in self._events:
+            old = self._events[start_time]
+            self._by_category[old.category].remove(start_time)
+            self._durations.remove(old.duration)
+        self._events[start_time] = event
+        self._by_category[event.category].add(start_time)
+        self._durations.add(event.duration)
+
+    def __delitem__(self, start_time):
+        event = self._events.pop(start_time)
+        self._by_category[event.category].remove(start_time)
+        self._durations.remove(event.duration)
+
+    def __contains__(self, start_time):
+        return start_time in self._events
+
+    def __iter__(self):
+        return iter(self._events)
+
+    def __len__(self):
+        return len(self._events)
+
+    def clear(self):
+        self._events.clear()
+        self._by_category.clear()
+        self._durations.clear()
+
+    # Views and range queries come straight from the sorted dict
+    def keys(self):
+        return self._events.keys()
+
+    def values(self):
+        return self._events.values()
+
+    def items(self):
+        return self._events.items()
+
+    def irange(self, *args, **kwargs):
+        return self._events.irange(*args, **kwargs)
+
+    def in_category(self, category):
+        """Start times of the events in a category, in order."""
+        return self._by_category.get(category, ())
+
+    def longest_duration(self):
+        """Duration in minutes of the longest stored event, or 0 when there are none."""
+        return self._durations[-1] if self._durations else 0
+
+
+# Event store: sorted by start time, indexed by category, tracking the longest duration
+events = EventStore()
+
+
+class Category(IntEnum):
+    """Event categories, resolved once when an event is stored so later checks are int compares."""
+    WORK = 0
+    EXERCISE = 1
+    LEISURE = 2
+
+
+# Display names, indexed by Category, and the lookup from a (case-insensitive) name to its Category
+CATEGORIES = tuple(category.name.capitalize() for category in Category)
+CATEGORY_BY_NAME = {category.name.lower(): category for category in Category}
+
+# Bounds of a day for free-time searches, built once instead of on every call
+_DAY_START = time(0, 0)
+_DAY_END = time(23, 59)
+# Where events are persisted; read at call time so it can be pointed elsewhere (e.g. by the tests)
+EVENTS_FILE = Path('events.json')
+# events.json keys are start times as whole minutes since this (naive) epoch
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MINUTE = timedelta(minutes=1)
+# Set by add/update/delete so events.json is rewritten once per run rather than after every change
+_dirty = False
+# Entries from events.json with an unknown category, by start time; kept so saving doesn't drop
+# them, and still treated as occupying their slots
+_unknown_entries = {}
+
+@lru_cache(maxsize=1024)
+def parse_date(date_str):
+    """Parse a 'YYYY-MM-DD HH:MM' or 'YYYY-MM-DD' string. Results are cached since parsing is pure."""
+    # Both formats are fixed width, so dispatch on length and slice the fields directly
+    # instead of trying strptime twice and paying for an exception on date-only input
+    value = date_str + " 00:00" if len(date_str) == 10 else date_str  # Default time to start of day
+    fields = (value[0:4], value[5:7], value[8:10], value[11:13], value[14:16])
+    if len(value) != 16 or value[4:14:3] != "-- :" or not all(field.isdigit() for field in fields):
+        raise ValueError(f"Invalid date format. Please use 'YYYY-MM-DD HH:MM'. Provided date: {date_str}")
+    try:
+        return datetime(*map(int, fields))
+    except ValueError:  # Well-formed but out of range, e.g. month 13
+        raise ValueError(f"Invalid date format. Please use 'YYYY-MM-DD HH:MM'. Provided date: {date_str}") from None
+
 
 def validate_date(date_str, test_time=1):
     """Validate datetime format and ensure the date is not past. Default time to start of day if not provided."""
-    try:
-        # Attempt to parse the datetime with time
-        date_time = datetime.strptime(date_str, "%Y-%m-%d %H:%M")
-    except ValueError:
-        try:
-            # If initial parsing fails, assume only the date is provided and append "00:00" for start of the day
-            date_time = datetime.strptime(date_str + " 00:00", "%Y-%m-%d %H:%M")
-        except ValueError:
-            raise ValueError(f"Invalid date format. Please use 'YYYY-MM-DD HH:MM'. Provided date: {date_str}")
+    # The future check stays outside the cache so it always compares against the current time
+    date_time = parse_date(date_str)
 
     if test_time == 1:
         if date_time <= datetime.now():
@@ -28,49 +131,106 @@ def validate_date(date_str, test_time=1):
 
     return date_time
 
+
+def format_datetime(date_time):
+    """Format a datetime as 'YYYY-MM-DD HH:MM' with the C-level isoformat, with no format string to interpret."""
+    return date_time.isoformat(' ', 'minutes')
+
+
+@dataclass(slots=True, frozen=True)
+class Event:
+    """A stored event. Its start time is the key it is stored under in events."""
+    name: str
+    category: Category
+    duration: int  # Minutes
+    end_time: datetime
+
+
+def make_event(start_time, name, category, duration):
+    """Build an Event, computing its end time once so scans don't rebuild it."""
+    return Event(name, category, duration, start_time + timedelta(minutes=duration))
+
 #--------------------------------------------------------------------------------------------------------------------------
 
 
 def load_events():
+    global _dirty
+    _dirty = False
+    _unknown_entries.clear()
     try:
-        with open('events.json', 'r') as file:
-            loaded_events = json.load(file)
-            events.clear()
-            for k, v in loaded_events.items():
-                start_datetime = datetime.strptime(k, '%Y-%m-%d %H:%M')
-                events[start_datetime] = (v['name'], v['category'], v['duration'])
+        # Read the raw bytes in one call and let json.loads decode them, skipping text-mode decoding
+        loaded_events = json.loads(EVENTS_FILE.read_bytes())
+        events.clear()
+        for k, v in loaded_events.items():
+            if len(k) == 16 and k[10] == ' ':
+                # Files saved before the minute keys use 'YYYY-MM-DD HH:MM'; they are rewritten on the next save
+                start_datetime = datetime(int(k[0:4]), int(k[5:7]), int(k[8:10]), int(k[11:13]), int(k[14:16]))
+            else:
+                start_datetime = _EPOCH + timedelta(minutes=int(k))
+            category = CATEGORY_BY_NAME.get(v['category'].lower())
+            if category is None:
+                print(f"Warning: skipping event '{v['name']}' ({format_datetime(start_datetime)}) with unknown category '{v['category']}'.", file=sys.stderr)
+                _unknown_entries[start_datetime] = v
+                continue
+            events[start_datetime] = make_event(start_datetime, v['name'], category, v['duration'])
     except (FileNotFoundError, json.JSONDecodeError):
         pass  # Handle errors or initialize an empty events dictionary
 
 #--------------------------------------------------------------------------------------------------------------------------
 
 def save_events():
-    with open('events.json', 'w') as file:
-        json.dump({k.strftime('%Y-%m-%d %H:%M'): {"name": v[0], "category": v[1], "duration": v[2]} for k, v in events.items()}, file)
+    # json.dumps encodes the whole payload in one C-level pass; json.dump would stream it in small chunks
+    data = {(k - _EPOCH) // _ONE_MINUTE: v for k, v in _unknown_entries.items()}
+    data.update({(k - _EPOCH) // _ONE_MINUTE: {"name": v.name, "category": CATEGORIES[v.category], "duration": v.duration} for k, v in events.items()})
+    payload = json.dumps(data)
+    # Write a temporary file, sync it to disk and atomically swap it in, so events.json is always
+    # either the old or the new version, never a truncated one; a failed write leaves no temp file behind
+    tmp_path = EVENTS_FILE.with_name(EVENTS_FILE.name + '.tmp')
+    try:
+        with open(tmp_path, 'w') as tmp_file:
+            tmp_file.write(payload)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_path, EVENTS_FILE)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def flush_events():
+    """Save events to disk only if they changed since they were loaded."""
+    global _dirty
+    if _dirty:
+        save_events()
+        _dirty = False
+
+
+@contextmanager
+def batched_saves():
+    """Defer saving until the block exits, then write events.json once if anything changed."""
+    try:
+        yield
+    finally:
+        flush_events()
 
 
 #--------------------------------------------------------------------------------------------------------------------------
 
 def main():
-    parser, args = help_maker()
-    if len(sys.argv) == 1:  # No arguments provided
-        parser.print_help()
-        sys.exit(1)
-
-    load_events()
+    args = fast_args(sys.argv[1:])
+    if args is None:
+        parser, args = help_maker()
+        if len(sys.argv) == 1:  # No arguments provided
+            parser.print_help()
+            sys.exit(1)
 
-    # Event management operations
+    # Reject incomplete commands before paying for load_events()
     if args.add:
         # Check if all required fields for adding an event are provided
         if not all([args.name, args.category, args.start_time, args.duration]):
             missing_args = [arg for arg, value in [('name', args.name), ('category', args.category), ('start-time', args.start_time), ('duration', args.duration)] if not value]
             print(f"Missing argument(s) for adding an event: {', '.join(missing_args)}")
             sys.exit(1)
-        # If all required arguments are provided, attempt to add the event
-        success = add_event(args.name, args.category, args.start_time, args.duration)
-        if not success:
-            print("Failed to add the event. Check details and try again.")
-            sys.exit(1)
 
     if args.update:
         if not args.start_time:
@@ -79,48 +239,63 @@ def main():
         if not any([args.name, args.category, args.duration]):
             print("No update information provided. Specify at least one of --name, --category, or --duration.")
             sys.exit(1)
-            
-        success = update_event(
-            args.start_time, 
-            new_name=args.name if args.name else None, 
-            new_category=args.category if args.category else None, 
-            new_duration=args.duration if args.duration else None
-        )
-        if not success:
-            print("Failed to update the event. Check details and try again.")
-            sys.exit(1)
-
-    if args.delete:
-        delete_event(args.delete)
-
-    # Event viewing and analytics
-    if args.view_events:
-        view_events()
 
-    if args.report:
-        generate_report()
-
-    if args.filter_category:
-        filter_events_by_category(args.filter_category)
+    load_events()
 
-    if args.free_times:
-        try:
-            specified_date = validate_date(args.free_times)  
-            free_times = find_free_times(specified_date)
-            if free_times:
-                for start, end in free_times:
-                    print(f"Free from {start.strftime('%Y-%m-%d %H:%M')} to {end.strftime('%Y-%m-%d %H:%M')}")
-            else:
-                print("No free times available on this day.")
-        except ValueError:
-            print("Invalid date format. Please use YYYY-MM-DD format.")
+    # Changes are written once, when the block exits, even if an operation exits early with an error
+    with batched_saves():
+        # Event management operations
+        if args.add:
+            # All required arguments are provided, so attempt to add the event
+            success = add_event(args.name, args.category, args.start_time, args.duration)
+            if not success:
+                print("Failed to add the event. Check details and try again.")
+                sys.exit(1)
+
+        if args.update:
+            success = update_event(
+                args.start_time, 
+                new_name=args.name if args.name else None, 
+                new_category=args.category if args.category else None, 
+                new_duration=args.duration if args.duration else None
+            )
+            if not success:
+                print("Failed to update the event. Check details and try again.")
+                sys.exit(1)
+
+        if args.delete:
+            delete_event(args.delete)
+
+        # Event viewing and analytics
+        if args.view_events:
+            view_events()
+
+        if args.report:
+            generate_report()
+
+        if args.filter_category:
+            filter_events_by_category(args.filter_category)
+
+        if args.free_times:
+            try:
+                specified_date = validate_date(args.free_times)  
+                free_times = find_free_times(specified_date)
+                if free_times:
+                    for start, end in free_times:
+                        print(f"Free from {format_datetime(start)} to {format_datetime(end)}")
+                else:
+                    print("No free times available on this day.")
+            except ValueError:
+                print("Invalid date format. Please use YYYY-MM-DD format.")
 
     sys.exit(0)
 
 
 #--------------------------------------------------------------------------------------------------------------------------
 
-def help_maker():
+@lru_cache(maxsize=None)  # Built on first use, then reused by every help_maker() call
+def build_parser():
+    import argparse  # Only imported when a command actually needs the full parser
     parser = argparse.ArgumentParser(
         description="Event Scheduler and Analyzer",
         formatter_class=argparse.RawTextHelpFormatter
@@ -128,7 +303,7 @@ def help_maker():
     
     # General flags for event manipulation
     parser.add_argument('-n', '--name', type=str, help='Name of the event.')
-    parser.add_argument('-c', '--category', type=str, choices=['Work', 'Exercise', 'Leisure'], help='Category of the event.')
+    parser.add_argument('-c', '--category', type=str, choices=CATEGORIES, help='Category of the event.')
     parser.add_argument('-s', '--start-time', type=str, help='Start time of the event in "YYYY-MM-DD HH:MM" format for adding or reference for update.')
     parser.add_argument('-t', '--duration', type=int, help='Duration of the event in minutes.')
 
@@ -139,26 +314,60 @@ def help_maker():
     parser.add_argument('-v', '--view-events', action='store_true', help='Display all events.')
     parser.add_argument('-r', '--report', action='store_true', help='Generate a report of all events.')
     parser.add_argument('-f', '--free-times', type=str, metavar='<DATE>', help='Check free times for a specified date in "YYYY-MM-DD HH:MM" format.')
-    parser.add_argument('-fc', '--filter-category', type=str, choices=['Work', 'Exercise', 'Leisure'], help='Filter events by category.')
+    parser.add_argument('-fc', '--filter-category', type=str, choices=CATEGORIES, help='Filter events by category.')
+
+    return parser
 
+
+def help_maker():
+    parser = build_parser()
     return parser, parser.parse_args()
 
 
+# Parsed values for a command line with no options set, matching build_parser()'s defaults
+_DEFAULT_ARGS = {
+    'name': None, 'category': None, 'start_time': None, 'duration': None, 'add': False, 'update': False,
+    'delete': None, 'view_events': False, 'report': False, 'free_times': None, 'filter_category': None
+}
+
+
+def fast_args(argv):
+    """Parse the common single-action commands without argparse. Returns None for anything else."""
+    if argv in (['-v'], ['--view-events']):
+        return SimpleNamespace(**{**_DEFAULT_ARGS, 'view_events': True})
+    if argv in (['-r'], ['--report']):
+        return SimpleNamespace(**{**_DEFAULT_ARGS, 'report': True})
+    if len(argv) == 2 and argv[0] in ('-d', '--delete') and not argv[1].startswith('-'):
+        return SimpleNamespace(**{**_DEFAULT_ARGS, 'delete': argv[1]})
+    return None
+
+
 #--------------------------------------------------------------------------------------------------------------------------
 
 # Function to check for time conflicts
 def is_time_conflict(new_start, new_duration):
+    """Check whether the new slot overlaps a stored event, scanning only events that could reach it."""
+    # Stored events may overlap each other (events.json isn't checked), so look back as far as the
+    # longest stored event could run rather than at just the one starting latest before new_end.
     new_end = new_start + timedelta(minutes=new_duration)
-    for start_time, details in events.items():
-        event_duration = details[2]  # Access the duration from the tuple
-        end_time = start_time + timedelta(minutes=event_duration)
-        if new_start < end_time and new_end > start_time:
+    earliest = new_start - timedelta(minutes=events.longest_duration())
+    for start_time in events.irange(earliest, new_end, inclusive=(True, False)):
+        if events[start_time].end_time > new_start:
+            return True
+    # Entries skipped for an unknown category still hold their slots, and never share a start time
+    for start_time, entry in _unknown_entries.items():
+        if start_time == new_start or (start_time < new_end and start_time + timedelta(minutes=entry['duration']) > new_start):
             return True
     return False
 #--------------------------------------------------------------------------------------------------------------------------
-# Function to add events using tuples
+# Function to add events
 def add_event(name, category, start_time, duration):
+    global _dirty
     # print(f"Adding event: {name}, Category: {category}, Starts at: {start_time}, Duration: {duration} minutes")
+    category_member = CATEGORY_BY_NAME.get(category.lower())
+    if category_member is None:
+        print(f"Unknown category '{category}'. Choose one of: {', '.join(CATEGORIES)}.")
+        return False
     try:
         start_datetime = validate_date(start_time) 
     except ValueError as e:
@@ -171,15 +380,15 @@ def add_event(name, category, start_time, duration):
         free_times = find_free_times(start_datetime)
         if free_times:
             for start, end in free_times:
-                print(f"Free from {start.strftime('%Y-%m-%d %H:%M')} to {end.strftime('%Y-%m-%d %H:%M')}")
+                print(f"Free from {format_datetime(start)} to {format_datetime(end)}")
         else:
             print("No free times available on this day.")
         return False
     
     # Store the event if no conflicts are found
-    events[start_datetime] = (name, category.lower(), duration)
-    print(f"Event added: {name} at {start_datetime.strftime('%Y-%m-%d %H:%M')}")
-    save_events()
+    events[start_datetime] = make_event(start_datetime, name, category_member, duration)
+    print(f"Event added: {name} at {format_datetime(start_datetime)}")
+    _dirty = True
     return True
 
 
@@ -187,6 +396,7 @@ def add_event(name, category, start_time, duration):
 #--------------------------------------------------------------------------------------------------------------------------
 
 def update_event(original_start_time, new_name=None, new_category=None, new_duration=None):
+    global _dirty
     try:
         # Convert the original start time to a datetime object
         event_datetime = validate_date(original_start_time)
@@ -198,10 +408,14 @@ def update_event(original_start_time, new_name=None, new_category=None, new_dura
         print(f"No event found at {original_start_time}.")
         return False
 
+    if new_category and new_category.lower() not in CATEGORY_BY_NAME:
+        print(f"Unknown category '{new_category}'. Choose one of: {', '.join(CATEGORIES)}.")
+        return False
+
     current_event = events[event_datetime]
-    updated_name = new_name if new_name else current_event[0]
-    updated_category = new_category.lower() if new_category else current_event[1]
-    updated_duration = new_duration if new_duration else current_event[2]
+    updated_name = new_name if new_name else current_event.name
+    updated_category = CATEGORY_BY_NAME[new_category.lower()] if new_category else current_event.category
+    updated_duration = new_duration if new_duration else current_event.duration
 
     # If the duration is being changed, check for conflicts before updating
     if new_duration and is_time_conflict(event_datetime, new_duration):
@@ -209,15 +423,16 @@ def update_event(original_start_time, new_name=None, new_category=None, new_dura
         return False
 
     # Update the event in the dictionary
-    events[event_datetime] = (updated_name, updated_category, updated_duration)
-    print(f"Event updated: {updated_name}, Category: {updated_category}, Duration: {updated_duration} minutes")
-    save_events()
+    events[event_datetime] = make_event(event_datetime, updated_name, updated_category, updated_duration)
+    print(f"Event updated: {updated_name}, Category: {CATEGORIES[updated_category]}, Duration: {updated_duration} minutes")
+    _dirty = True
     return True
 
 #--------------------------------------------------------------------------------------------------------------------------
 
 def delete_event(start_time):
     """Delete an event based on its start time, after printing all current events."""
+    global _dirty
     # Validate the input date format and convert to datetime
     try:
         start_datetime = validate_date(start_time,test_time=0)
@@ -228,138 +443,129 @@ def delete_event(start_time):
     # Attempt to delete the event
     if start_datetime in events:
         del events[start_datetime]
-        print(f"Event scheduled to start at {start_datetime.strftime('%Y-%m-%d %H:%M')} has been deleted.")
-        save_events()
+        print(f"Event scheduled to start at {format_datetime(start_datetime)} has been deleted.")
+        _dirty = True
     else:
-        print(f"No event found starting at {start_datetime.strftime('%Y-%m-%d %H:%M')}.")
+        print(f"No event found starting at {format_datetime(start_datetime)}.")
 
 #--------------------------------------------------------------------------------------------------------------------------
 
-# Function to view events with tuple format
+# Function to view events
 def view_events():
     if not events:
         print("No scheduled events.")
         return
-    print("Viewing all scheduled events:")
-    print(f"{'Start Time':<20} {'Name':<30} {'Category':<15} {'Duration (min)':<15}")
-    print("-" * 75)
-    for start_time, (name, category, duration) in sorted(events.items()):
-        start_str = start_time.strftime('%Y-%m-%d %H:%M')
-        print(f"{start_str:<20} {name:<30} {category:<15} {duration:<15d}")
+    # Collect every line and write them in one call instead of one print() per event
+    lines = ["Viewing all scheduled events:", f"{'Start Time':<20} {'Name':<30} {'Category':<15} {'Duration (min)':<15}", "-" * 75]
+    for start_time, event in events.items():
+        start_str = format_datetime(start_time)
+        lines.append(f"{start_str:<20} {event.name:<30} {CATEGORIES[event.category]:<15} {event.duration:<15d}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 #--------------------------------------------------------------------------------------------------------------------------
 
-def generate_day_durations():
-    day_durations = {}
-    for start, details in events.items():
-        day = start.date()
-        day_durations[day] = day_durations.get(day, 0) + details[2]
-        yield day, day_durations[day]
-
 def busiest_days():
-    day_durations = {}
-    for day, duration in generate_day_durations():
-        day_durations[day] = duration
+    day_durations = defaultdict(int)
+    for start, event in events.items():
+        day_durations[start.date()] += event.duration
     busiest = sorted(day_durations.items(), key=lambda x: x[1], reverse=True)
     return busiest
 
-def trend_generator():
+def trends_over_time():
     weekly_durations = defaultdict(lambda: defaultdict(int))  # Nested defaultdict to track categories
-    for start, details in events.items():
-        week = start.strftime('%Y-%U')  # Year and week number
-        category = details[1].lower()
-        weekly_durations[week][category] += details[2]
-        yield week, weekly_durations[week]
+    for start, event in events.items():
+        week = start.toordinal() - start.isoweekday() % 7  # Ordinal of the Sunday that starts the week
+        weekly_durations[week][event.category] += event.duration
 
-def trends_over_time():
-    trends = defaultdict(dict)
-    for week, durations in trend_generator():
-        total_duration = sum(durations.values())
+    # Summarise each week once, after all of its events have been counted
+    trends = {}
+    for week, durations in weekly_durations.items():
         max_category = max(durations, key=durations.get)  # Find the category with the highest duration
         trends[week] = {
-            "total_duration": total_duration,
-            "max_category": max_category.capitalize(),
+            "total_duration": sum(durations.values()),
+            "max_category": CATEGORIES[max_category],
             "max_category_duration": durations[max_category]
         }
     weeks_sorted = sorted(trends.items())
     return weeks_sorted
 
 def total_time_per_category():
-    category_times = {}
-    for category in ['work', 'exercise', 'leisure']:  # Ensure all categories are accounted for
-        total_time = sum(details[2] for start, details in events.items() if details[1].lower() == category)
-        category_times[category.capitalize()] = total_time
-    return category_times
+    totals = [0] * len(Category)  # Ensure all categories are accounted for
+    # Bucket every event in a single pass instead of rescanning events once per category
+    for event in events.values():
+        totals[event.category] += event.duration
+    return dict(zip(CATEGORIES, totals))
+
+
+def draw_table(headings, widths, rows):
+    """Lay out rows as fixed-width text columns under a header, in the same style as view_events."""
+    lines = [" ".join(f"{heading:<{width}}" for heading, width in zip(headings, widths))]
+    lines.append("-" * (sum(widths) + len(widths) - 1))
+    for row in rows:
+        lines.append(" ".join(f"{cell!s:<{width}}" for cell, width in zip(row, widths)))
+    return "\n".join(lines)
 
 
 def generate_report():
     print("\nGenerating comprehensive event report...")
-    with open('report_log.log', 'w') as log_file:
-        # Report: Total Time Spent Per Category
-        print("\nTotal Time Spent Per Category:", file=log_file)
-        category_times = total_time_per_category()
-        tab = tt.Texttable()
-        headings = ['Category', 'Total Time (minutes)']
-        tab.header(headings)
-        tab.set_cols_width([10, 20])  # Adjust column widths as necessary
-        for category, time in category_times.items():
-            tab.add_row([category, time])
-        print(tab.draw(), file=log_file)
-
-        # Report: Busiest Days
-        print("\nBusiest Days (most active first):", file=log_file)
-        busiest_days_list = busiest_days()
-        tab = tt.Texttable()
-        headings = ['Date', 'Total Time (minutes)']
-        tab.header(headings)
-        tab.set_cols_width([20, 20])  # Increase width to prevent wrapping
-        if busiest_days_list:
-            for day, duration in busiest_days_list:
-                tab.add_row([day.strftime('%A, %B %d, %Y'), duration])
-        else:
-            print("No events to report.", file=log_file)
-        print(tab.draw(), file=log_file)
-
-        # Report: Trends Over Time
-        tab = tt.Texttable()
-        print("\nTrends Over Time (weekly):", file=log_file)
-        trend_data = trends_over_time()
-        headings = ['Week Starting', 'Total Time (minutes)', 'Max Category', 'Max Category Time (minutes)']
-        tab.header(headings)
-        tab.set_cols_width([20, 20, 15, 25])  # Set column widths
-    
-        if trend_data:
-            for week, data in trend_data:
-                start_date = datetime.strptime(week + '-1', "%Y-%U-%w").strftime('%B %d, %Y')
-                tab.add_row([
-                    start_date,
-                    data['total_duration'],
-                    data['max_category'],
-                    data['max_category_duration']
-                ])
-        else:
-            print("No sufficient data for trend analysis.")
-        print(tab.draw(), file=log_file)
-
+    # Build the whole report in memory, then write the log and echo it from the same string
+    report = io.StringIO()
+
+    # Report: Total Time Spent Per Category
+    print("\nTotal Time Spent Per Category:", file=report)
+    category_times = total_time_per_category()
+    print(draw_table(['Category', 'Total Time (minutes)'], [10, 20], category_times.items()), file=report)
+
+    # Report: Busiest Days
+    print("\nBusiest Days (most active first):", file=report)
+    busiest_days_list = busiest_days()
+    if not busiest_days_list:
+        print("No events to report.", file=report)
+    rows = [(day.strftime('%A, %B %d, %Y'), duration) for day, duration in busiest_days_list]
+    print(draw_table(['Date', 'Total Time (minutes)'], [30, 20], rows), file=report)
+
+    # Report: Trends Over Time
+    print("\nTrends Over Time (weekly):", file=report)
+    trend_data = trends_over_time()
+    if not trend_data:
+        print("No sufficient data for trend analysis.", file=report)
+    rows = [
+        (
+            datetime.fromordinal(week + 1).strftime('%B %d, %Y'),  # Monday of that week
+            data['total_duration'],
+            data['max_category'],
+            data['max_category_duration']
+        )
+        for week, data in trend_data
+    ]
+    headings = ['Week Starting', 'Total Time (minutes)', 'Max Category', 'Max Category Time (minutes)']
+    print(draw_table(headings, [20, 20, 15, 27], rows), file=report)
 
-    with open('report_log.log', 'r') as log_file:
-        print(log_file.read())
+    output = report.getvalue()
+    with open('report_log.log', 'w') as log_file:
+        log_file.write(output)
+    sys.stdout.write(output)
 
 
 #--------------------------------------------------------------------------------------------------------------------------
 def find_free_times(date):
-    day_events = [(start_time, details) for start_time, details in events.items() if start_time.date() == date.date()]
-    day_events.sort()
     free_times = []
-    last_end_time = datetime.combine(date, datetime.min.time())
-
-    for start_time, details in day_events:
+    day_start = datetime.combine(date, _DAY_START)
+    last_end_time = day_start
+
+    # events is sorted, so the day's events are one contiguous range: no full scan or re-sort needed
+    next_day = day_start + timedelta(days=1)
+    busy = ((start_time, events[start_time].end_time) for start_time in events.irange(day_start, next_day, inclusive=(True, False)))
+    if _unknown_entries:
+        # Entries skipped for an unknown category still hold their slots
+        busy = sorted([*busy, *((start_time, start_time + timedelta(minutes=entry['duration']))
+                                for start_time, entry in _unknown_entries.items() if day_start <= start_time < next_day)])
+    for start_time, end_time in busy:
         if start_time > last_end_time:
             free_times.append((last_end_time, start_time))
-        current_end_time = start_time + timedelta(minutes=details[2])
-        last_end_time = max(last_end_time, current_end_time)
+        last_end_time = max(last_end_time, end_time)
 
-    end_of_day = datetime.combine(date, datetime.max.time().replace(second=0, microsecond=0))
+    end_of_day = datetime.combine(date, _DAY_END)
     if last_end_time < end_of_day:
         free_times.append((last_end_time, end_of_day))
 
@@ -368,16 +574,17 @@ def find_free_times(date):
 #--------------------------------------------------------------------------------------------------------------------------
 
 def filter_events_by_category(category):
-    filtered_events = {time: details for time, details in events.items() if details[1].lower() == category.lower() }
-    if not filtered_events:
+    # Look the category up in the index rather than scanning every event
+    start_times = events.in_category(CATEGORY_BY_NAME.get(category.lower()))
+    if not start_times:
         print(f"No events found in category '{category}'.")
     else:
-        print(f"Events in category '{category}':")
-        print(f"{'Start Time':<20} {'Name':<30} {'Category':<15} {'Duration (min)':<15}")
-        print("-" * 75)
-        for start_time, (name, cat, duration) in sorted(filtered_events.items()):
-            start_str = start_time.strftime('%Y-%m-%d %H:%M')
-            print(f"{start_str:<20} {name:<30} {cat:<15} {duration:<15d}")
+        lines = [f"Events in category '{category}':", f"{'Start Time':<20} {'Name':<30} {'Category':<15} {'Duration (min)':<15}", "-" * 75]
+        for start_time in start_times:
+            event = events[start_time]
+            start_str = format_datetime(start_time)
+            lines.append(f"{start_str:<20} {event.name:<30} {CATEGORIES[event.category]:<15} {event.duration:<15d}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
 #--------------------------------------------------------------------------------------------------------------------------
 
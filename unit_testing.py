@@ -1,132 +1,266 @@
+import json
 import pytest
-from datetime import datetime
-from freezegun import freeze_time
+from datetime import datetime, timedelta
+import time_machine
+import main
 from main import (
     validate_date, add_event, update_event, delete_event, view_events,
-    find_free_times, filter_events_by_category, events, save_events, load_events
+    find_free_times, filter_events_by_category, events, save_events, load_events, make_event,
+    Category, fast_args, build_parser, is_time_conflict, trends_over_time, generate_report
 )
-from unittest.mock import patch
+
+# Parse the datetimes the tests share once, at import, instead of in every test
+D = datetime.fromisoformat
+
+SEP15 = datetime(2024, 9, 15)
+SEP16 = datetime(2024, 9, 16)
+SEP15_08 = D("2024-09-15 08:00")
+SEP15_11 = D("2024-09-15 11:00")
+SEP15_12 = D("2024-09-15 12:00")
+SEP15_17 = D("2024-09-15 17:00")
+_MIN_TIME = datetime.min.time()
+_MAX_TIME_NO_SECS = datetime.max.time().replace(second=0, microsecond=0)
+
+# Starting data for every test, built once; Event is frozen, so tests can share the instances
+_TEMPLATE_EVENTS = {
+    SEP15_11: make_event(SEP15_11, "Sprint Review", Category.WORK, 60),
+    SEP15_17: make_event(SEP15_17, "Park Picnic", Category.LEISURE, 120)
+}
 
 # Mock the events dictionary to start with known data
 @pytest.fixture(autouse=True)
 def setup_events():
-    # Used `global` keyword to modify the global `events` dictionary directly
-    global events
+    # Mutate the shared store in place; main holds the same object, so it must never be rebound
     events.clear()
-    events.update({
-        datetime.strptime("2024-09-15 11:00", "%Y-%m-%d %H:%M"): ("Sprint Review", "Work", 60),
-        datetime.strptime("2024-09-15 17:00", "%Y-%m-%d %H:%M"): ("Park Picnic", "Leisure", 120)
-    })
-
-# Testing validate_date with different scenarios using freezegun to freeze time
-@pytest.mark.parametrize("date_str, expected_exception, expected_message, is_future", [
-    ("2024-09-05 12:00", None, None, True),  # Future date with time
-    ("2024-09-03 12:00", ValueError, "The date '2024-09-03 12:00' must be in the future.", False),  # Past date with time
-    ("2024-09-04", ValueError, "The date '2024-09-04' must be in the future.", False),  # Today's date without time, should fail
-    ("2024-09-06", None, None, True),  # Future date without time
-    ("2024-09-02", ValueError, "The date '2024-09-02' must be in the future.", False),  # Past date without time
-    ("invalid-date", ValueError, "Invalid date format. Please use 'YYYY-MM-DD HH:MM'. Provided date: invalid-date", None),  # Invalid format
-    ("2024-09-04 12:00", ValueError, "The date '2024-09-04 12:00' must be in the future.", False)  # Exact current moment
-])
-@freeze_time("2024-09-04 12:00")
-def test_validate_date(date_str, expected_exception, expected_message, is_future):
+    events.update(_TEMPLATE_EVENTS)
+    main._unknown_entries.clear()
+
+# Freeze the clock once for the module instead of once per parametrized case. It stays frozen for the
+# rest of the module once started, so every test that depends on "now" must request it itself
+@pytest.fixture(scope="module")
+def frozen_clock():
+    with time_machine.travel("2024-09-04 12:00", tick=False):
+        yield
+
+# Point persistence at a temporary file for the whole session, so saves do real I/O without touching events.json
+@pytest.fixture(autouse=True, scope="session")
+def redirect_storage(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('main.EVENTS_FILE', tmp_path_factory.mktemp("ev") / "events.json")
+        yield
+
+# Testing validate_date with different scenarios using time-machine to freeze time
+@pytest.mark.parametrize("date_str, expected_exception, expected_message", (
+    ("2024-09-05 12:00", None, None),  # Future date with time
+    ("2024-09-03 12:00", ValueError, "The date '2024-09-03 12:00' must be in the future."),  # Past date with time
+    ("2024-09-04", ValueError, "The date '2024-09-04' must be in the future."),  # Today's date without time, should fail
+    ("2024-09-06", None, None),  # Future date without time
+    ("2024-09-02", ValueError, "The date '2024-09-02' must be in the future."),  # Past date without time
+    ("invalid-date", ValueError, "Invalid date format. Please use 'YYYY-MM-DD HH:MM'. Provided date: invalid-date"),  # Invalid format
+    ("2024-09-04 12:00", ValueError, "The date '2024-09-04 12:00' must be in the future."),  # Exact current moment
+), ids=["future_dt", "past_dt", "today_date", "future_date", "past_date", "invalid_fmt", "now_moment"])
+@pytest.mark.usefixtures("frozen_clock")
+def test_validate_date(date_str, expected_exception, expected_message):
     if expected_exception:
         with pytest.raises(expected_exception) as exc_info:
             validate_date(date_str)
         assert expected_message in str(exc_info.value)
-    elif is_future:
-        # Expect the function to return a datetime object
-        result = validate_date(date_str)
-        assert isinstance(result, datetime)
     else:
-        # Test should pass without raising an exception for current or ambiguous cases
-        result = validate_date(date_str)
-        assert isinstance(result, datetime)
+        # Expect the function to return a datetime object
+        assert isinstance(validate_date(date_str), datetime)
 
 # Testing add_event functionality with different scenarios
-@pytest.mark.parametrize("start_time, is_future, has_conflict, expected_result", [
+@pytest.mark.parametrize("start_time, is_future, has_conflict, expected_result", (
     ("2025-01-01 12:00", True, False, True),  # Future date, no conflict
     ("2023-01-01 12:00", False, False, False), # Past date, should raise error
     ("2025-01-01 12:00", True, True, False),  # Future date, but with conflict
-])
-def test_add_event(mocker, start_time, is_future, has_conflict, expected_result):
-    mocker.patch('main.validate_date', side_effect=ValueError("Date must be in the future") if not is_future else lambda x: datetime.strptime(x, "%Y-%m-%d %H:%M"))
-    mocker.patch('main.is_time_conflict', return_value=has_conflict)
-    mocker.patch('main.save_events')
+))
+def test_add_event(monkeypatch, start_time, is_future, has_conflict, expected_result):
+    def past_date(date_str):
+        raise ValueError("Date must be in the future")
+    monkeypatch.setattr('main.validate_date', D if is_future else past_date)
+    monkeypatch.setattr('main.is_time_conflict', lambda start, duration: has_conflict)
     result = add_event("Meeting", "Work", start_time, 60)
     assert result == expected_result
     if result:
-        assert datetime.strptime(start_time, "%Y-%m-%d %H:%M") in events
+        assert D(start_time) in events
+
+# Testing update_event with and without a conflict; the fixture events are only "future" under the frozen clock
+@pytest.mark.parametrize("has_conflict", (True, False), ids=["conflict", "no_conflict"])
+@pytest.mark.usefixtures("frozen_clock")
+def test_update_event(mocker, has_conflict):
+    mock_conflict = mocker.stub(name='is_time_conflict')
+    mock_conflict.return_value = has_conflict
+    mocker.patch('main.is_time_conflict', new=mock_conflict)
+    result = update_event("2024-09-15 11:00", "Updated Meeting", "Work", 90)
+    assert result is not has_conflict
+    mock_conflict.assert_called_once()
+    # A conflicting update must leave the event untouched
+    expected = _TEMPLATE_EVENTS[SEP15_11] if has_conflict else make_event(SEP15_11, "Updated Meeting", Category.WORK, 90)
+    assert events[SEP15_11] == expected
 
-# Testing update_event with conflict detection
-def test_update_event_with_conflict():
-    with patch('main.is_time_conflict', return_value=True) as mock_conflict:
-        result = update_event("2024-09-15 11:00", "Urgent Client Meeting", "Work", 120)
-        assert not result
-        assert mock_conflict.called, "Conflict check should have been called"
+# Testing is_time_conflict directly against the template events (Sprint Review 11:00-12:00, Park Picnic 17:00-19:00)
+@pytest.mark.parametrize("start, duration, expected", (
+    ("2024-09-15 10:00", 60, False),  # Ends exactly when Sprint Review starts
+    ("2024-09-15 12:00", 60, False),  # Starts exactly when Sprint Review ends
+    ("2024-09-15 11:15", 30, True),  # Contained in Sprint Review
+    ("2024-09-15 10:30", 120, True),  # Spans all of Sprint Review
+    ("2024-09-15 18:30", 60, True),  # Starts while Park Picnic is running
+), ids=["adjacent_before", "adjacent_after", "contained", "spanning", "overlaps_end"])
+def test_is_time_conflict(start, duration, expected):
+    assert is_time_conflict(D(start), duration) is expected
 
-# Testing update_event when no conflict exists
-def test_update_event_without_conflict():
-    with patch('main.is_time_conflict', return_value=False) as mock_conflict:
-        with patch('main.save_events', return_value=None):
-            result = update_event("2024-09-15 11:00", "Updated Meeting", "Work", 90)
-            assert result
-            assert mock_conflict.called, "Conflict check should have been called"
-            assert events[datetime.strptime("2024-09-15 11:00", "%Y-%m-%d %H:%M")] == ("Updated Meeting", "work", 90)
+def test_is_time_conflict_across_midnight():
+    events[D("2024-09-16 00:15")] = make_event(D("2024-09-16 00:15"), "Night Shift", Category.WORK, 30)
+    assert is_time_conflict(D("2024-09-15 23:30"), 60)
+    assert not is_time_conflict(D("2024-09-15 23:30"), 45)
 
+def test_is_time_conflict_with_overlapping_stored_events():
+    # events.json isn't checked for overlaps, so a long event can still be running past a later, shorter one
+    events.clear()
+    events[D("2027-02-01 10:00")] = make_event(D("2027-02-01 10:00"), "Offsite", Category.WORK, 240)
+    events[D("2027-02-01 11:00")] = make_event(D("2027-02-01 11:00"), "Call", Category.WORK, 30)
+    assert is_time_conflict(D("2027-02-01 12:00"), 60)
+    assert not is_time_conflict(D("2027-02-01 14:00"), 60)
 
 # Test delete_event functionality
 def test_delete_event_existing():
     # Ensure an event exists before deleting
     delete_event("2024-09-15 11:00")
-    assert datetime.strptime("2024-09-15 11:00", "%Y-%m-%d %H:%M") not in events
+    assert SEP15_11 not in events
 
-def test_delete_event_non_existing():
-    with patch('builtins.print') as mocked_print:
-        delete_event("2025-01-01 12:00")
-        mocked_print.assert_called_with("No event found starting at 2025-01-01 12:00.")
-
-def test_delete_event_invalid_format():
-    with patch('builtins.print') as mocked_print:
-        delete_event("invalid-date")
-        mocked_print.assert_called_with("Error: Invalid date format. Please use 'YYYY-MM-DD HH:MM'. Provided date: invalid-date")
+@pytest.mark.parametrize("date_str, expected_msg", (
+    ("2025-01-01 12:00", "No event found starting at 2025-01-01 12:00."),
+    ("invalid-date", "Error: Invalid date format. Please use 'YYYY-MM-DD HH:MM'. Provided date: invalid-date"),
+), ids=["missing", "invalid_format"])
+def test_delete_event_missing_or_invalid(capsys, date_str, expected_msg):
+    delete_event(date_str)
+    assert expected_msg in capsys.readouterr().out
 
 # Test view_events functionality
-def test_view_events_no_events():
+def test_view_events_no_events(capsys):
     events.clear()
-    with patch('builtins.print') as mocked_print:
-        view_events()
-        mocked_print.assert_called_with("No scheduled events.")
+    view_events()
+    assert "No scheduled events." in capsys.readouterr().out
 
-def test_view_events_with_events():
-    with patch('builtins.print') as mocked_print:
-        view_events()
-        assert mocked_print.call_count > 1  # More than one print statement for listing events
+def test_view_events_with_events(capsys):
+    view_events()
+    output = capsys.readouterr().out
+    assert "Sprint Review" in output and "Park Picnic" in output  # Every event is listed
 
 # Test find_free_times functionality
-def test_find_free_times_fully_booked_day():
-    fully_booked_date = datetime.strptime("2024-09-15", "%Y-%m-%d")
+@pytest.fixture(scope="module")
+def booked_day():
+    return {
+        SEP15_08: make_event(SEP15_08, "Morning Meeting", Category.WORK, 180),  # 8:00 - 11:00
+        SEP15_11: make_event(SEP15_11, "Lunch", Category.LEISURE, 60),  # 11:00 - 12:00
+        SEP15_12: make_event(SEP15_12, "Afternoon Workshop", Category.WORK, 300),  # 12:00 - 17:00
+    }
+
+def test_find_free_times_fully_booked_day(booked_day):
     events.clear()
-    events.update({
-        datetime.strptime("2024-09-15 08:00", "%Y-%m-%d %H:%M"): ("Morning Meeting", "Work", 180),  # 8:00 - 11:00
-        datetime.strptime("2024-09-15 11:00", "%Y-%m-%d %H:%M"): ("Lunch", "Leisure", 60),  # 11:00 - 12:00
-        datetime.strptime("2024-09-15 12:00", "%Y-%m-%d %H:%M"): ("Afternoon Workshop", "Work", 300),  # 12:00 - 17:00
-    })
-    free_times = find_free_times(fully_booked_date)
+    events.update(booked_day)
+    free_times = find_free_times(SEP15)
     assert len(free_times) == 2  # Expected free time slots: before 8:00 and after 17:00
 
 def test_find_free_times_no_events():
-    date = datetime.strptime("2024-09-16", "%Y-%m-%d")
-    free_times = find_free_times(date)
-    assert free_times == [(datetime.combine(date, datetime.min.time()), datetime.combine(date, datetime.max.time().replace(second=0, microsecond=0)))]
+    free_times = find_free_times(SEP16)
+    assert free_times == [(datetime.combine(SEP16, _MIN_TIME), datetime.combine(SEP16, _MAX_TIME_NO_SECS))]
 
 # Test filter_events_by_category functionality
-def test_filter_events_by_category_with_events():
-    with patch('builtins.print') as mocked_print:
-        filter_events_by_category('Work')
-        assert mocked_print.call_count > 1  # Events are printed
-
-def test_filter_events_by_category_no_events():
-    with patch('builtins.print') as mocked_print:
-        filter_events_by_category('NonExistentCategory')
-        mocked_print.assert_called_with("No events found in category 'NonExistentCategory'.")
\ No newline at end of file
+def test_filter_events_by_category_with_events(capsys):
+    filter_events_by_category('Work')
+    output = capsys.readouterr().out
+    assert "Sprint Review" in output and "Park Picnic" not in output  # Only Work events are printed
+
+def test_filter_events_by_category_no_events(capsys):
+    filter_events_by_category('NonExistentCategory')
+    assert "No events found in category 'NonExistentCategory'." in capsys.readouterr().out
+
+# Test the argparse-free fast path agrees with the full parser
+@pytest.mark.parametrize("argv", (["-v"], ["--view-events"], ["-r"], ["--report"], ["-d", "2024-09-15 11:00"]))
+def test_fast_args_matches_parser(argv):
+    assert vars(fast_args(argv)) == vars(build_parser().parse_args(argv))
+
+@pytest.mark.parametrize("argv", ([], ["-v", "-r"], ["-d", "-v"], ["-a", "-n", "Meeting"]))
+def test_fast_args_falls_back(argv):
+    assert fast_args(argv) is None
+
+# Test save_events/load_events round-trip through the redirected events file
+def test_save_and_load_events_round_trip():
+    save_events()
+    events.clear()
+    load_events()
+    assert dict(events) == _TEMPLATE_EVENTS
+
+def test_load_events_skips_unknown_category(capsys):
+    main.EVENTS_FILE.write_text(json.dumps({
+        "2024-09-15 11:00": {"name": "Sprint Review", "category": "Work", "duration": 60},
+        "2024-09-15 17:00": {"name": "Dentist", "category": "Personal", "duration": 30}
+    }))
+    load_events()
+    assert list(events) == [SEP15_11]
+    captured = capsys.readouterr()
+    assert "Warning: skipping event 'Dentist' (2024-09-15 17:00) with unknown category 'Personal'." in captured.err
+    assert captured.out == ""  # Kept out of listing and report output
+    # The skipped entry is written back, under a minute key like the rest, rather than lost
+    save_events()
+    saved = json.loads(main.EVENTS_FILE.read_text())
+    assert saved[str((SEP15_17 - datetime(1970, 1, 1)) // timedelta(minutes=1))] == {"name": "Dentist", "category": "Personal", "duration": 30}
+
+def test_load_events_reads_legacy_keys():
+    # Files written before the minute keys (like the shipped events.json) use 'YYYY-MM-DD HH:MM'
+    main.EVENTS_FILE.write_text(json.dumps({
+        "2024-09-15 11:00": {"name": "Sprint Review", "category": "Work", "duration": 60},
+        "2024-09-15 17:00": {"name": "Park Picnic", "category": "leisure", "duration": 120}
+    }))
+    events.clear()
+    load_events()
+    assert dict(events) == _TEMPLATE_EVENTS
+    save_events()
+    saved = json.loads(main.EVENTS_FILE.read_text())
+    assert saved == {
+        str((SEP15_11 - datetime(1970, 1, 1)) // timedelta(minutes=1)): {"name": "Sprint Review", "category": "Work", "duration": 60},
+        str((SEP15_17 - datetime(1970, 1, 1)) // timedelta(minutes=1)): {"name": "Park Picnic", "category": "Leisure", "duration": 120}
+    }
+
+def test_save_events_failure_keeps_file_and_removes_temp(monkeypatch):
+    save_events()
+    before = main.EVENTS_FILE.read_bytes()
+    events.clear()
+    def failing_fsync(fd):
+        raise OSError("disk full")
+    monkeypatch.setattr('os.fsync', failing_fsync)
+    with pytest.raises(OSError):
+        save_events()
+    assert main.EVENTS_FILE.read_bytes() == before
+    assert not main.EVENTS_FILE.with_name(main.EVENTS_FILE.name + '.tmp').exists()
+
+# Test weekly trends: weeks run Sunday to Saturday and are labelled by their Monday
+def test_trends_over_time_week_spanning_new_year(monkeypatch, tmp_path, capsys):
+    events.clear()
+    for start, name, duration in (("2025-12-31 09:00", "Year End Review", 60), ("2026-01-02 09:00", "Planning", 90), ("2026-01-04 09:00", "Kickoff", 30)):
+        events[D(start)] = make_event(D(start), name, Category.WORK, duration)
+    trends = trends_over_time()
+    # Wednesday and Friday share the week of Sunday 2025-12-28; Sunday 2026-01-04 starts the next one
+    assert [(week, data["total_duration"]) for week, data in trends] == [(D("2025-12-28 00:00").toordinal(), 150), (D("2026-01-04 00:00").toordinal(), 30)]
+    monkeypatch.chdir(tmp_path)  # generate_report writes report_log.log to the working directory
+    generate_report()
+    output = capsys.readouterr().out
+    assert "December 29, 2025" in output and "January 05, 2026" in output
+
+def test_add_event_next_to_unknown_category_entry(capsys):
+    # An entry already saved with a minute key must keep its slot and survive alongside new events
+    unknown_key = str((D("2030-01-01 10:00") - datetime(1970, 1, 1)) // timedelta(minutes=1))
+    main.EVENTS_FILE.write_text(json.dumps({unknown_key: {"name": "Dentist", "category": "Personal", "duration": 60}}))
+    load_events()
+    assert not add_event("Clash", "Work", "2030-01-01 10:00", 30)  # Same start time
+    assert not add_event("Overlap", "Work", "2030-01-01 10:30", 30)  # Starts while it is running
+    assert (D("2030-01-01 00:00"), D("2030-01-01 10:00")) in find_free_times(D("2030-01-01 00:00"))
+    assert add_event("Meeting", "Work", "2030-01-01 11:00", 30)
+    save_events()
+    saved = json.loads(main.EVENTS_FILE.read_text())
+    assert len(saved) == 2 and all(key.isdigit() for key in saved)
+    load_events()
+    assert list(events) == [D("2030-01-01 11:00")]
+    assert main._unknown_entries == {D("2030-01-01 10:00"): {"name": "Dentist", "category": "Personal", "duration": 60}}